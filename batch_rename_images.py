@@ -21,7 +21,7 @@ from datetime import datetime
 PREFIX = "img"
 START_INDEX = 1
 NUM_DIGITS = 3
-EXTENSIONS = ("jpg", "jpeg", "png", "gif", "bmp", "tiff", "webp")
+EXTENSIONS = frozenset(("jpg", "jpeg", "png", "gif", "bmp", "tiff", "webp"))
 
 
 def parse_args():
@@ -76,26 +76,58 @@ def ask_collision_action(old, new):
         print("Enter O, S, or R.")
 
 
-def resolve_collision(target_path):
+def name_key(name):
+    # Windows and macOS filesystems are case-insensitive by default, so
+    # "img_001.JPG" already occupies "img_001.jpg" there
+    if sys.platform in ("win32", "darwin"):
+        return os.path.normcase(name).casefold()
+    return name
+
+
+def resolve_collision(target_path, existing, counters):
+    # Resume probing where the last collision on this name left off
     base, ext = os.path.splitext(target_path)
-    idx = 1
+    idx = counters.get((base, ext), 1)
     while True:
         new_path = f"{base}_{idx}{ext}"
-        if not os.path.exists(new_path):
+        if name_key(os.path.basename(new_path)) not in existing:
+            counters[(base, ext)] = idx + 1
             return new_path
         idx += 1
 
 
+def sync_dir(path):
+    # Flush all renames in one go; directories can't be opened on Windows
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
 def main():
     args = parse_args()
-
-    # Gather files
-    all_files = sorted(os.listdir(args.dir))
-    images = [
-        f for f in all_files
-        if os.path.isfile(os.path.join(args.dir, f))
-        and f.lower().split(".")[-1] in EXTENSIONS
-    ]
+    target_dir = args.dir
+    preview = args.preview
+    # Built once: "<prefix>_{:0<digits>d}.{}" with braces in the prefix escaped
+    prefix = args.prefix.replace("{", "{{").replace("}", "}}")
+    format_name = f"{prefix}_{{:0{max(args.digits, 0)}d}}.{{}}".format
+
+    # Gather files, remembering every name in the directory for collision checks
+    existing = set()
+    images = []
+    with os.scandir(target_dir) as it:
+        for e in it:
+            existing.add(name_key(e.name))
+            if (e.name.rpartition(".")[2].lower() in EXTENSIONS
+                    and e.is_file(follow_symlinks=False)):
+                images.append(e)
+    images.sort(key=lambda e: e.name)
 
     if not images:
         log("No image files found. Exiting.")
@@ -106,19 +138,25 @@ def main():
     skipped_count = 0
     error_count = 0
 
-    for i, filename in enumerate(images):
-        ext = filename.lower().split(".")[-1]
-        new_name = f"{args.prefix}_{str(index).zfill(args.digits)}.{ext}"
-        old_path = os.path.join(args.dir, filename)
-        new_path = os.path.join(args.dir, new_name)
+    # Plan every rename up front against a simulated copy of the directory
+    planned = set(existing)
+    renames = []
+    collision_counters = {}
+    for i, entry in enumerate(images):
+        filename = entry.name
+        ext = filename.rpartition(".")[2].lower()
+        new_name = format_name(index, ext)
+        old_path = entry.path
+        new_path = os.path.join(target_dir, new_name)
 
         # Preview mode: show first mapping, then exit
-        if args.preview:
+        if preview:
             log(f"Preview: '{filename}' → '{new_name}'")
             sys.exit(0)
 
         # Handle collision
-        if os.path.exists(new_path):
+        overwrite = False
+        if name_key(new_name) in planned:
             action = ask_collision_action(old_path, new_path)
             if action == "skip":
                 log(f"Skipping '{filename}'")
@@ -126,21 +164,37 @@ def main():
                 index += 1
                 continue
             if action == "rename":
-                resolved = resolve_collision(new_path)
+                resolved = resolve_collision(new_path, planned, collision_counters)
                 log(f"Auto-renamed collision to '{os.path.basename(resolved)}'")
                 new_path = resolved
-            # if overwrite, fall through to rename
+            else:
+                overwrite = True
 
-        # Perform rename
+        planned.discard(name_key(filename))
+        planned.add(name_key(os.path.basename(new_path)))
+        renames.append((filename, old_path, new_path, overwrite))
+        index += 1
+
+    # Perform renames, keeping the set of names on disk up to date so a
+    # failed rename can't let a later one clobber the file it left behind
+    for filename, old_path, new_path, overwrite in renames:
+        new_name = os.path.basename(new_path)
+        if name_key(new_name) in existing and not overwrite:
+            log(f"Error renaming '{filename}': target '{new_name}' still exists")
+            error_count += 1
+            continue
         try:
             os.replace(old_path, new_path)
-            log(f"Renamed '{filename}' → '{os.path.basename(new_path)}'")
+            existing.discard(name_key(filename))
+            existing.add(name_key(new_name))
+            log(f"Renamed '{filename}' → '{new_name}'")
             renamed_count += 1
         except Exception as e:
             log(f"Error renaming '{filename}': {e}")
             error_count += 1
 
-        index += 1
+    if renamed_count:
+        sync_dir(target_dir)
 
     # Summary
     log(f"Done. Renamed: {renamed_count}, Skipped: {skipped_count}, Errors: {error_count}")
@@ -9,7 +9,8 @@ Usage:
   python check_class_balance.py --dir /path/to/dataset [options]
 
 Features:
-- Assumes each class is a subdirectory under the target directory.
+- Assumes each class is a subdirectory under the target directory;
+  nested class/subclass folders are counted as separate classes.
 - Counts files with configurable extensions.
 - Alerts if any class count / max_count < ratio_threshold.
 - Alerts if max_count – class_count > diff_threshold.
@@ -19,10 +20,9 @@ Features:
 import argparse
 import os
 import sys
-from tabulate import tabulate
 
 # Supported file extensions
-EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff", ".webp")
+EXTENSIONS = frozenset((".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff", ".webp"))
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -31,7 +31,7 @@ def parse_args():
     parser.add_argument(
         "-d", "--dir",
         default=".",
-        help="Root directory of dataset (each subfolder is a class)"
+        help="Root directory of dataset (each subfolder, at any depth, is a class)"
     )
     parser.add_argument(
         "--ratio-threshold",
@@ -48,18 +48,47 @@ def parse_args():
     return parser.parse_args()
 
 def gather_class_counts(root_dir):
+    # Every subdirectory (at any depth) that is a leaf or holds supported
+    # files is a class, named by its path relative to root_dir.
     counts = {}
-    for entry in os.listdir(root_dir):
-        class_path = os.path.join(root_dir, entry)
-        if os.path.isdir(class_path):
-            files = [
-                f for f in os.listdir(class_path)
-                if os.path.isfile(os.path.join(class_path, f))
-                and os.path.splitext(f)[1].lower() in EXTENSIONS
-            ]
-            counts[entry] = len(files)
+    pending = [(root_dir, None)]
+    while pending:
+        path, name = pending.pop()
+        count = 0
+        subdirs = []
+        with os.scandir(path) as it:
+            for e in it:
+                # Cheap name check first; is_file() then comes from d_type
+                if (os.path.splitext(e.name)[1].lower() in EXTENSIONS
+                        and e.is_file(follow_symlinks=False)):
+                    count += 1
+                elif e.is_dir(follow_symlinks=False) and not e.name.startswith("."):
+                    subdirs.append(e)
+        for e in subdirs:
+            sub_name = e.name if name is None else os.path.join(name, e.name)
+            pending.append((e.path, sub_name))
+        if name is not None and (count or not subdirs):
+            counts[name] = count
     return counts
 
+def format_table(rows, headers, align):
+    # GitHub-style markdown table; align holds "<" or ">" per column
+    cells = [[str(x) for x in row] for row in rows]
+    widths = [
+        max(len(headers[i]), *(len(row[i]) for row in cells))
+        for i in range(len(headers))
+    ]
+
+    def fmt_row(values):
+        return "| " + " | ".join(
+            f"{v:{a}{w}}" for v, a, w in zip(values, align, widths)
+        ) + " |"
+
+    separator = "|" + "|".join("-" * (w + 2) for w in widths) + "|"
+    lines = [fmt_row(headers), separator]
+    lines.extend(fmt_row(row) for row in cells)
+    return "\n".join(lines)
+
 def main():
     args = parse_args()
     root = args.dir
@@ -91,10 +120,10 @@ def main():
             imbalance = True
 
     # Print table
-    print(tabulate(
+    print(format_table(
         summary,
         headers=["Class", "Count", "Count/Max", "Diff", "Status"],
-        tablefmt="github"
+        align="<>>><"
     ))
 
     if imbalance:
@@ -5,18 +5,47 @@ cleanup_dataset.py
 Scans a directory for duplicate files (by SHA256) and corrupt images.
 Removes duplicates (keeping one copy) and deletes unreadable image files.
 
+File hashes are cached in a SQLite database keyed by path, size and
+mtime, so repeat runs only hash new or modified files.
+
 Usage:
-  python cleanup_dataset.py --dir /path/to/folder [--dry-run]
+  python cleanup_dataset.py --dir /path/to/folder [--dry-run] [--no-hash-db]
 """
 
 import argparse
 import hashlib
+import math
 import os
+import sqlite3
 import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, UnidentifiedImageError
 
 # Supported image extensions
 IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff", ".webp")
+# Magic numbers of supported image formats
+IMAGE_SIGNATURES = (
+    b"\xff\xd8\xff",              # JPEG
+    b"\x89PNG\r\n\x1a\n",         # PNG
+    b"GIF87a", b"GIF89a",         # GIF
+    b"BM",                        # BMP
+    b"II*\x00", b"MM\x00*",       # TIFF
+)
+# Bytes read for the corrupt-image header check
+HEADER_SIZE = 32
+# Bytes hashed as a cheap pre-filter before a full-file hash
+PREFIX_SIZE = 65536
+# Files above the threshold are first compared by size + head + tail samples
+SAMPLE_THRESHOLD = "64M"
+SAMPLE_SIZE = 1024 * 1024
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+# Hashing and image verification are I/O-bound and release the GIL
+MAX_WORKERS = (os.cpu_count() or 1) * 2
+# Persistent cache of full-file hashes across runs
+HASH_DB_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "dataset-wrangler", "hashdb.sqlite"
+)
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -32,41 +61,251 @@ def parse_args():
         action="store_true",
         help="Show what would be deleted without actually removing files"
     )
+    parser.add_argument(
+        "--hash-db",
+        default=HASH_DB_PATH,
+        help=f"SQLite file caching hashes between runs (default: {HASH_DB_PATH})"
+    )
+    parser.add_argument(
+        "--no-hash-db",
+        action="store_true",
+        help="Hash every file from scratch without reading or updating the cache"
+    )
+    parser.add_argument(
+        "--sample-threshold",
+        type=parse_size,
+        default=SAMPLE_THRESHOLD,
+        help="Compare files larger than this by sampled head/tail hashes before "
+             f"a full hash, e.g. 512K, 64M, 1G; 0 disables (default: {SAMPLE_THRESHOLD})"
+    )
     return parser.parse_args()
 
+def parse_size(text):
+    value = text.strip().upper()
+    if value.endswith("B"):
+        value = value[:-1]
+    unit = value[-1:] if value[-1:] in SIZE_UNITS else ""
+    try:
+        number = float(value[:len(value) - len(unit)])
+    except ValueError:
+        number = None
+    if number is None or not math.isfinite(number) or number < 0:
+        raise argparse.ArgumentTypeError(f"invalid size: '{text}'")
+    return int(number * SIZE_UNITS[unit])
+
 def compute_hash(path, block_size=65536):
-    hasher = hashlib.sha256()
+    with open(path, "rb", buffering=0) as f:
+        # Python 3.11+: hash in C without per-block Python round trips
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        # Otherwise read into one reusable buffer; no bytes object per block
+        hasher = hashlib.sha256()
+        buf = bytearray(block_size)
+        view = memoryview(buf)
+        while n := f.readinto(buf):
+            hasher.update(view[:n])
+        return hasher.hexdigest()
+
+def probe_file(path, check_header, hash_prefix):
+    # One open and one read per file serve both the image header check and
+    # the duplicate prefix hash. Returns (header_ok, prefix_hash).
     with open(path, "rb") as f:
-        for block in iter(lambda: f.read(block_size), b""):
-            hasher.update(block)
-    return hasher.hexdigest()
+        head = f.read(PREFIX_SIZE if hash_prefix else HEADER_SIZE)
+    header_ok = has_image_signature(head) if check_header else True
+    prefix_hash = hashlib.sha256(head).hexdigest() if hash_prefix else None
+    return header_ok, prefix_hash
+
+def compute_sampled_hash(path, sample_size=SAMPLE_SIZE):
+    # size || first block || last block: constant cost regardless of file size.
+    # Buffered reads keep going until sample_size bytes or EOF.
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        hasher = hashlib.sha256(str(size).encode())
+        hasher.update(f.read(sample_size))
+        f.seek(max(size - sample_size, 0))
+        hasher.update(f.read(sample_size))
+        return hasher.hexdigest()
+
+def open_hash_db(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS hashes ("
+        "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, sha256 TEXT)"
+    )
+    return conn
+
+def load_cached_hashes(conn, files):
+    # Only rows whose size and mtime still match the file on disk are used
+    cached = {}
+    for path, _ext, size, mtime_ns in files:
+        row = conn.execute(
+            "SELECT sha256 FROM hashes WHERE path = ? AND mtime_ns = ? AND size = ?",
+            (os.path.abspath(path), mtime_ns, size),
+        ).fetchone()
+        if row:
+            cached[path] = row[0]
+    return cached
+
+def save_hashes(conn, files, hashes):
+    rows = [
+        (os.path.abspath(path), mtime_ns, size, hashes[path])
+        for path, _ext, size, mtime_ns in files if path in hashes
+    ]
+    with conn:  # single transaction, so a single commit/fsync
+        conn.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?)", rows)
+
+def forget_hashes(conn, paths):
+    with conn:
+        conn.executemany(
+            "DELETE FROM hashes WHERE path = ?",
+            [(os.path.abspath(path),) for path in paths],
+        )
+
+def group_by(paths, key, pool=None):
+    groups = defaultdict(list)
+    values = pool.map(key, paths) if pool else map(key, paths)
+    for path, value in zip(paths, values):
+        if value is not None:  # unreadable
+            groups[value].append(path)
+    return [group for group in groups.values() if len(group) > 1]
+
+def scan_files(files, pool, hash_db=None, sample_threshold=0):
+    # Only files sharing a size can be duplicates; of those, only files
+    # sharing the first block (and, for large files, the sampled head and
+    # tail) need a full hash. Files that can't be read are neither corrupt
+    # nor duplicates. Returns (duplicates, corrupt images, unreadable files).
+    unreadable = set()
+
+    def guarded(read):
+        def wrapper(path):
+            try:
+                return read(path)
+            except OSError:
+                unreadable.add(path)
+                return None
+        return wrapper
+
+    sizes = Counter(size for _path, _ext, size, _mtime in files)
+    candidates = [f for f in files if sizes[f[2]] > 1]
+    known = {}
+    computed = {}
+    if hash_db:
+        try:
+            known = load_cached_hashes(hash_db, candidates)
+        except sqlite3.Error as e:
+            print(f"Warning: could not read hash cache: {e}")
+
+    by_size = defaultdict(list)
+    for path, _ext, size, _mtime in candidates:
+        by_size[size].append(path)
+
+    # Size groups fully covered by the hash cache need no reads at all
+    need_prefix = {
+        path for paths in by_size.values()
+        if not all(p in known for p in paths) for path in paths
+    }
+    images = {
+        path for path, ext, _size, _mtime in files if ext in IMAGE_EXTENSIONS
+    }
+    to_probe = [
+        path for path, _ext, _size, _mtime in files
+        if path in images or path in need_prefix
+    ]
+    probes = dict(zip(to_probe, pool.map(
+        guarded(lambda p: probe_file(p, p in images, p in need_prefix)),
+        to_probe
+    )))
+
+    # Corrupt images: only files without a known header get a PIL decode
+    suspects = [
+        p for p in to_probe
+        if p in images and probes[p] is not None and not probes[p][0]
+    ]
+    corrupts = [
+        path for path, corrupt in zip(
+            suspects, pool.map(guarded(is_corrupt_image), suspects)
+        )
+        if corrupt
+    ]
+
+    def group_by_full_hash(paths):
+        missing = [p for p in paths if p not in known]
+        for path, file_hash in zip(
+            missing, pool.map(guarded(compute_hash), missing)
+        ):
+            if file_hash is not None:
+                known[path] = computed[path] = file_hash
+        return group_by([p for p in paths if p in known], known.__getitem__)
 
-def find_duplicates(file_paths):
-    hashes = {}
     duplicates = []
-    for path in file_paths:
-        file_hash = compute_hash(path)
-        if file_hash in hashes:
-            duplicates.append((path, hashes[file_hash]))
+    for size, paths in by_size.items():
+        if all(p in known for p in paths):
+            groups = group_by(paths, known.__getitem__)
         else:
-            hashes[file_hash] = path
-    return duplicates
+            groups = []
+            readable = [p for p in paths if probes[p] is not None]
+            if size <= PREFIX_SIZE:
+                # The prefix hash covers the whole file, so it can be cached
+                for p in readable:
+                    known[p] = computed[p] = probes[p][1]
+            for same_prefix in group_by(readable, lambda p: probes[p][1]):
+                if size <= PREFIX_SIZE:
+                    groups.append(same_prefix)
+                elif sample_threshold and size > sample_threshold:
+                    for same_sample in group_by(
+                        same_prefix, guarded(compute_sampled_hash), pool
+                    ):
+                        groups.extend(group_by_full_hash(same_sample))
+                else:
+                    groups.extend(group_by_full_hash(same_prefix))
+        for group in groups:
+            group = [p for p in group if p not in unreadable]
+            if len(group) > 1:
+                orig_path, *dup_paths = group
+                duplicates.extend((dup, orig_path) for dup in dup_paths)
 
-def is_corrupt_image(path):
-    try:
-        with Image.open(path) as img:
-            img.verify()
-        return False
-    except (UnidentifiedImageError, OSError):
+    if hash_db and computed:
+        try:
+            save_hashes(hash_db, candidates, computed)
+        except sqlite3.Error as e:
+            print(f"Warning: could not update hash cache: {e}")
+    return sorted(duplicates), corrupts, sorted(unreadable)
+
+def has_image_signature(header):
+    if header.startswith(IMAGE_SIGNATURES):
         return True
+    return header[:4] == b"RIFF" and header[8:12] == b"WEBP"
+
+def is_corrupt_image(path):
+    # Only identification/decode failures mean corrupt; a failure to read
+    # the file at all propagates to the caller.
+    with open(path, "rb") as f:
+        try:
+            with Image.open(f) as img:
+                img.verify()
+            return False
+        except UnidentifiedImageError:
+            return True
+        except OSError as e:
+            if e.errno is not None:
+                raise
+            return True
 
 def gather_all_files(root_dir):
-    all_files = []
-    for fname in os.listdir(root_dir):
-        full = os.path.join(root_dir, fname)
-        if os.path.isfile(full):
-            all_files.append(full)
-    return sorted(all_files)
+    # One scan: (path, lowercased extension, size, mtime_ns) per regular file
+    files = []
+    with os.scandir(root_dir) as it:
+        for e in it:
+            if e.is_file(follow_symlinks=False):
+                st = e.stat(follow_symlinks=False)
+                files.append((
+                    e.path,
+                    os.path.splitext(e.name)[1].lower(),
+                    st.st_size,
+                    st.st_mtime_ns,
+                ))
+    return sorted(files)
 
 def main():
     args = parse_args()
@@ -78,17 +317,26 @@ def main():
 
     files = gather_all_files(root)
 
-    # Detect duplicates
-    duplicates = find_duplicates(files)
-    # Detect corrupt images
-    corrupts = [
-        path for path in files
-        if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
-        and is_corrupt_image(path)
-    ]
+    hash_db = None
+    if not args.no_hash_db:
+        try:
+            hash_db = open_hash_db(args.hash_db)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: hash cache disabled ({args.hash_db}): {e}")
+
+    # Detect duplicates and corrupt images
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        duplicates, corrupts, unreadable = scan_files(
+            files, pool, hash_db, args.sample_threshold
+        )
+
+    for path in unreadable:
+        print(f"[ERROR] Could not read {path}; skipped")
 
     if not duplicates and not corrupts:
         print("No duplicates or corrupt images found.")
+        if hash_db:
+            hash_db.close()
         return
 
     # Summarize
@@ -102,11 +350,13 @@ def main():
     print()
 
     # Process duplicates
+    removed = []
     for dup_path, orig_path in duplicates:
         print(f"[DUP] Remove: {dup_path}  (duplicate of {orig_path})")
         if not args.dry_run:
             try:
                 os.remove(dup_path)
+                removed.append(dup_path)
             except Exception as e:
                 print(f"  [ERROR] Failed to delete {dup_path}: {e}")
 
@@ -116,9 +366,19 @@ def main():
         if not args.dry_run:
             try:
                 os.remove(corrupt_path)
+                removed.append(corrupt_path)
             except Exception as e:
                 print(f"  [ERROR] Failed to delete {corrupt_path}: {e}")
 
+    # Drop cache rows for deleted files so the shared database doesn't grow
+    if hash_db:
+        if removed:
+            try:
+                forget_hashes(hash_db, removed)
+            except sqlite3.Error as e:
+                print(f"Warning: could not update hash cache: {e}")
+        hash_db.close()
+
     if not args.dry_run:
         print("\nCleanup complete.")
 
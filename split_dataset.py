@@ -8,6 +8,7 @@ with a default 70/20/10 ratio.
 Features:
 - Configurable ratios and random seed
 - Copy (default) or move mode
+- --hardlink / --reflink to share file data instead of copying it
 - --preview to show counts without touching any files
 - Summary of successes and failures
 """
@@ -17,6 +18,17 @@ import os
 import random
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Concurrent copies/moves; disk and network I/O can absorb several at once
+MAX_WORKERS = 8
+# Linux ioctl request for a copy-on-write clone (btrfs, XFS)
+FICLONE = 0x40049409
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -56,11 +68,22 @@ def parse_args():
         default=42,
         help="Random seed for shuffling (default: 42)"
     )
-    parser.add_argument(
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
         "--move",
         action="store_true",
         help="Move files instead of copying"
     )
+    mode.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="Hardlink files instead of copying when on the same filesystem"
+    )
+    mode.add_argument(
+        "--reflink",
+        action="store_true",
+        help="Clone files copy-on-write (btrfs/XFS) instead of copying"
+    )
     parser.add_argument(
         "--preview",
         action="store_true",
@@ -76,10 +99,8 @@ def validate_ratios(train, val, test):
 
 
 def gather_files(src_dir):
-    return sorted(
-        f for f in os.listdir(src_dir)
-        if os.path.isfile(os.path.join(src_dir, f))
-    )
+    with os.scandir(src_dir) as it:
+        return sorted(e.name for e in it if e.is_file(follow_symlinks=False))
 
 
 def make_dirs(root, subsets):
@@ -93,17 +114,84 @@ def split_indices(n, train_r, val_r):
     n_val = int(n * val_r)
     n_test = n - n_train - n_val
     return (
-        list(range(0, n_train)),
-        list(range(n_train, n_train + n_val)),
-        list(range(n_train + n_val, n))
+        slice(0, n_train),
+        slice(n_train, n_train + n_val),
+        slice(n_train + n_val, n)
     )
 
 
-def dispatch_file(src, dst, move_mode):
+def same_filesystem(src_dir, dst_dir):
+    return os.stat(src_dir).st_dev == os.stat(dst_dir).st_dev
+
+
+def ensure_not_same_file(src, dst):
+    # Opening or removing dst would destroy src when both are the same file
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+
+
+def copy_in_kernel(src, dst):
+    # copy2 equivalent that keeps the data in the kernel via copy_file_range
+    ensure_not_same_file(src, dst)
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if sent == 0:
+                # Some filesystems stop early; let the caller use copy2
+                raise OSError(f"copy_file_range stopped short copying {src!r}")
+            remaining -= sent
+    shutil.copystat(src, dst)
+    return dst
+
+
+def hardlink(src, dst):
+    ensure_not_same_file(src, dst)
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        os.remove(dst)
+        os.link(src, dst)
+    return dst
+
+
+def reflink(src, dst):
+    ensure_not_same_file(src, dst)
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    shutil.copystat(src, dst)
+    return dst
+
+
+def dispatch_file(src, dst, move_mode, same_fs=False, link_mode=None):
+    # Returns how the file was actually transferred, for the summary
     if move_mode:
-        return shutil.move(src, dst)
-    else:
-        return shutil.copy2(src, dst)
+        if same_fs:
+            try:
+                os.replace(src, dst)
+                return "Moved"
+            except OSError:
+                pass  # e.g. EXDEV; shutil.move knows how to recover
+        shutil.move(src, dst)
+        return "Moved"
+    # Share the data blocks when possible; fall back to a real copy
+    attempts = []
+    if same_fs and link_mode == "hardlink":
+        attempts.append((hardlink, "Linked"))
+    if same_fs and link_mode == "reflink" and fcntl is not None:
+        attempts.append((reflink, "Cloned"))
+    if same_fs and hasattr(os, "copy_file_range"):
+        attempts.append((copy_in_kernel, "Copied"))
+    for transfer, label in attempts:
+        try:
+            transfer(src, dst)
+            return label
+        except shutil.SameFileError:
+            raise
+        except OSError:
+            pass  # e.g. unsupported by the filesystem; try the next method
+    shutil.copy2(src, dst)
+    return "Copied"
 
 
 def main():
@@ -114,8 +202,7 @@ def main():
     if not files:
         sys.exit("No files found in source directory.")
 
-    random.seed(args.seed)
-    random.shuffle(files)
+    random.Random(args.seed).shuffle(files)
 
     train_idx, val_idx, test_idx = split_indices(
         len(files),
@@ -124,9 +211,9 @@ def main():
     )
 
     subsets = {
-        "train": [files[i] for i in train_idx],
-        "val":   [files[i] for i in val_idx],
-        "test":  [files[i] for i in test_idx],
+        "train": files[train_idx],
+        "val":   files[val_idx],
+        "test":  files[test_idx],
     }
 
     print("Preview of split counts:")
@@ -136,24 +223,59 @@ def main():
         sys.exit(0)
 
     make_dirs(args.dest_dir, subsets.keys())
+    same_fs = same_filesystem(args.src_dir, args.dest_dir)
+    if args.hardlink:
+        link_mode = "hardlink"
+    elif args.reflink:
+        link_mode = "reflink"
+    else:
+        link_mode = None
+    if link_mode and not same_fs:
+        print(f"Warning: --{link_mode} needs source and destination on the "
+              "same filesystem; copying instead.")
+    elif link_mode == "reflink" and fcntl is None:
+        print("Warning: --reflink is not supported on this platform; "
+              "copying instead.")
+
+    # Join directory prefixes once instead of calling os.path.join per file
+    src_prefix = os.path.join(args.src_dir, "")
+    dst_prefixes = {
+        name: os.path.join(args.dest_dir, name, "") for name in subsets
+    }
+
+    if args.move:
+        action = "Moved"
+    elif link_mode == "hardlink":
+        action = "Linked"
+    elif link_mode == "reflink":
+        action = "Cloned"
+    else:
+        action = "Copied"
+    done = {action: 0}
+    errs = 0
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        jobs = []
+        for subset_name, file_list in subsets.items():
+            dst_prefix = dst_prefixes[subset_name]
+            for filename in file_list:
+                src_path = src_prefix + filename
+                dst_path = dst_prefix + filename
+                future = pool.submit(
+                    dispatch_file, src_path, dst_path, args.move, same_fs,
+                    link_mode
+                )
+                jobs.append((future, filename, subset_name))
 
-    moved = copied = errs = 0
-    for subset_name, file_list in subsets.items():
-        for filename in file_list:
-            src_path = os.path.join(args.src_dir, filename)
-            dst_path = os.path.join(args.dest_dir, subset_name, filename)
+        for future, filename, subset_name in jobs:
             try:
-                dispatch_file(src_path, dst_path, args.move)
-                if args.move:
-                    moved += 1
-                else:
-                    copied += 1
+                label = future.result()
+                done[label] = done.get(label, 0) + 1
             except Exception as e:
                 print(f"[ERROR] {filename} → {subset_name}: {e}")
                 errs += 1
 
-    action = "Moved" if args.move else "Copied"
-    print(f"\nDone. {action}: {moved if args.move else copied}, Errors: {errs}")
+    counts = ", ".join(f"{label}: {n}" for label, n in done.items())
+    print(f"\nDone. {counts}, Errors: {errs}")
 
 
 if __name__ == "__main__":